@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import date
+import msgspec
 import structlog
 
-from database import get_db
+from database import get_db, get_redis
 from models import User, LeaveType, LeaveBalance, CorporateHoliday, UserRole
-from utils.auth import get_admin_user
+from routers.shared import HOLIDAYS_CACHE_KEY, LEAVE_TYPES_CACHE_KEY
+from utils.auth import get_admin_user, invalidate_user_cache
 
 logger = structlog.get_logger()
 
+# ORJSONResponse is the app-wide default response class
 router = APIRouter()
 
 
@@ -62,39 +68,53 @@ class HolidayResponse(BaseModel):
     id: int
     date: date
     description: str
-    
+
     class Config:
         from_attributes = True
 
 
+# msgspec row for the user list; encodes much faster than Pydantic for
+# large responses while producing the same JSON shape
+class UserRow(msgspec.Struct):
+    id: int
+    username: str
+    email: str
+    role: str
+    manager_id: int | None
+
+
 @router.post("/users", response_model=UserResponse)
 async def create_or_update_user(
     user_request: CreateUserRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Create or update a user"""
     try:
-        # Check if user exists
-        existing_user = db.query(User).filter(User.username == user_request.username).first()
-        
+        # Fetch the target user and (optional) manager in one query and
+        # partition client-side instead of two sequential SELECTs
+        usernames = [user_request.username]
+        if user_request.manager_username:
+            usernames.append(user_request.manager_username)
+
+        result = await db.execute(select(User).where(User.username.in_(usernames)))
+        users_by_name = {u.username: u for u in result.scalars()}
+
+        existing_user = users_by_name.get(user_request.username)
+        manager = users_by_name.get(user_request.manager_username) if user_request.manager_username else None
+
+        if user_request.manager_username and not manager:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Manager not found"
+            )
+
         if existing_user:
             # Update existing user
             existing_user.email = user_request.email
             existing_user.role = user_request.role
-            
-            # Set manager if provided
-            if user_request.manager_username:
-                manager = db.query(User).filter(User.username == user_request.manager_username).first()
-                if not manager:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Manager not found"
-                    )
-                existing_user.manager_id = manager.id
-            else:
-                existing_user.manager_id = None
-            
+            existing_user.manager_id = manager.id if manager else None
+
             user = existing_user
             logger.info("User updated", username=user.username, admin=admin_user.username)
         else:
@@ -104,46 +124,56 @@ async def create_or_update_user(
                 "email": user_request.email,
                 "role": user_request.role
             }
-            
-            # Set manager if provided
-            if user_request.manager_username:
-                manager = db.query(User).filter(User.username == user_request.manager_username).first()
-                if not manager:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Manager not found"
-                    )
+
+            if manager:
                 user_data["manager_id"] = manager.id
-            
+
             user = User(**user_data)
             db.add(user)
-            db.flush()  # Get the ID
-            
+            await db.flush()  # Get the ID
+
             # Create initial leave balances for employees
             if user.role == UserRole.EMPLOYEE:
-                leave_types = db.query(LeaveType).all()
-                for leave_type in leave_types:
+                # Only the id and default quota are needed, so skip ORM
+                # hydration and send all balances as one multi-row INSERT
+                result = await db.execute(select(LeaveType.id, LeaveType.default_quota))
+                balance_rows = []
+                for leave_type_id, default_quota in result.all():
                     # Use custom quota if provided, otherwise use default
-                    quota = user_request.initial_quotas.get(leave_type.id, leave_type.default_quota) if user_request.initial_quotas else leave_type.default_quota
-                    
-                    balance = LeaveBalance(
-                        user_id=user.id,
-                        leave_type_id=leave_type.id,
-                        remaining_days=quota
-                    )
-                    db.add(balance)
-            
+                    quota = user_request.initial_quotas.get(leave_type_id, default_quota) if user_request.initial_quotas else default_quota
+
+                    balance_rows.append({
+                        "user_id": user.id,
+                        "leave_type_id": leave_type_id,
+                        "remaining_days": quota
+                    })
+
+                if balance_rows:
+                    await db.execute(insert(LeaveBalance), balance_rows)
+
             logger.info("User created", username=user.username, admin=admin_user.username)
-        
-        db.commit()
-        db.refresh(user)
-        return UserResponse.from_orm(user)
+
+        await db.commit()
+        await db.refresh(user)
+
+        # Drop any cached auth lookup so role/manager changes take effect
+        # immediately
+        await invalidate_user_cache(user.username)
+
+        # Row comes straight from the DB, so skip re-validation
+        return UserResponse.model_construct(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role.value,
+            manager_id=user.manager_id
+        )
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Failed to create/update user", error=str(e), admin=admin_user.username)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create/update user"
@@ -154,54 +184,41 @@ async def create_or_update_user(
 async def update_leave_balance(
     user_id: int,
     balance_request: UpdateBalanceRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Update a user's leave balance for a specific leave type"""
     try:
-        # Find the leave balance
-        balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == user_id,
-            LeaveBalance.leave_type_id == balance_request.leave_type_id
-        ).first()
-        
-        if not balance:
-            # Create new balance if it doesn't exist
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            leave_type = db.query(LeaveType).filter(LeaveType.id == balance_request.leave_type_id).first()
-            if not leave_type:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Leave type not found"
-                )
-            
-            balance = LeaveBalance(
-                user_id=user_id,
-                leave_type_id=balance_request.leave_type_id,
-                remaining_days=balance_request.remaining_days
+        # Single-roundtrip, race-free upsert instead of SELECT-then-branch;
+        # the FK constraints stand in for the old existence checks
+        stmt = pg_insert(LeaveBalance).values(
+            user_id=user_id,
+            leave_type_id=balance_request.leave_type_id,
+            remaining_days=balance_request.remaining_days
+        ).on_conflict_do_update(
+            index_elements=["user_id", "leave_type_id"],
+            set_={"remaining_days": balance_request.remaining_days}
+        )
+
+        try:
+            await db.execute(stmt)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User or leave type not found"
             )
-            db.add(balance)
-            logger.info("Leave balance created", user_id=user_id, leave_type_id=balance_request.leave_type_id, admin=admin_user.username)
-        else:
-            # Update existing balance
-            balance.remaining_days = balance_request.remaining_days
-            logger.info("Leave balance updated", user_id=user_id, leave_type_id=balance_request.leave_type_id, admin=admin_user.username)
-        
-        db.commit()
-        
+
+        logger.info("Leave balance updated", user_id=user_id, leave_type_id=balance_request.leave_type_id, admin=admin_user.username)
+
         return {"message": "Leave balance updated successfully"}
-        
+
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Failed to update leave balance", error=str(e), admin=admin_user.username)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update leave balance"
@@ -211,35 +228,46 @@ async def update_leave_balance(
 @router.post("/leave-types", response_model=LeaveTypeResponse)
 async def create_leave_type(
     leave_type_request: CreateLeaveTypeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Create a new leave type"""
     try:
-        # Check if leave type already exists
-        existing = db.query(LeaveType).filter(LeaveType.name == leave_type_request.name).first()
-        if existing:
+        # ON CONFLICT DO NOTHING folds the exists-check and insert into
+        # one roundtrip; no returned row means the name is already taken
+        stmt = pg_insert(LeaveType).values(
+            name=leave_type_request.name,
+            default_quota=leave_type_request.default_quota
+        ).on_conflict_do_nothing(index_elements=["name"]).returning(LeaveType.id)
+
+        new_id = (await db.execute(stmt)).scalar()
+        if new_id is None:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Leave type already exists"
             )
-        
-        leave_type = LeaveType(
+        await db.commit()
+
+        # Drop the cached /leave-types payload so readers see the new type
+        try:
+            redis_client = await get_redis()
+            await redis_client.delete(LEAVE_TYPES_CACHE_KEY)
+        except Exception as e:
+            logger.warning("Failed to invalidate leave type cache", error=str(e))
+
+        logger.info("Leave type created", name=leave_type_request.name, admin=admin_user.username)
+        return LeaveTypeResponse.model_construct(
+            id=new_id,
             name=leave_type_request.name,
             default_quota=leave_type_request.default_quota
         )
-        db.add(leave_type)
-        db.commit()
-        db.refresh(leave_type)
-        
-        logger.info("Leave type created", name=leave_type.name, admin=admin_user.username)
-        return LeaveTypeResponse.from_orm(leave_type)
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Failed to create leave type", error=str(e), admin=admin_user.username)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create leave type"
@@ -249,35 +277,51 @@ async def create_leave_type(
 @router.post("/holidays", response_model=HolidayResponse)
 async def create_holiday(
     holiday_request: CreateHolidayRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """Create a new corporate holiday"""
     try:
-        # Check if holiday already exists for this date
-        existing = db.query(CorporateHoliday).filter(CorporateHoliday.date == holiday_request.date).first()
-        if existing:
+        # ON CONFLICT DO NOTHING folds the exists-check and insert into
+        # one roundtrip; no returned row means the date is already taken
+        stmt = pg_insert(CorporateHoliday).values(
+            date=holiday_request.date,
+            description=holiday_request.description
+        ).on_conflict_do_nothing(index_elements=["date"]).returning(CorporateHoliday.id)
+
+        new_id = (await db.execute(stmt)).scalar()
+        if new_id is None:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Holiday already exists for this date"
             )
-        
-        holiday = CorporateHoliday(
+        await db.commit()
+
+        # Drop the per-year holiday set rather than appending to it: the
+        # employee submission path repopulates it read-through from the
+        # DB, which keeps the set complete even when other writers (the
+        # seeder, direct inserts) bypass this endpoint
+        try:
+            redis_client = await get_redis()
+            await redis_client.delete(f"holidays:{holiday_request.date.year}")
+            # Drop the cached /holidays payload so readers see the new date
+            await redis_client.delete(HOLIDAYS_CACHE_KEY)
+        except Exception as e:
+            logger.warning("Failed to invalidate holiday cache", error=str(e))
+
+        logger.info("Holiday created", date=holiday_request.date, description=holiday_request.description, admin=admin_user.username)
+        return HolidayResponse.model_construct(
+            id=new_id,
             date=holiday_request.date,
             description=holiday_request.description
         )
-        db.add(holiday)
-        db.commit()
-        db.refresh(holiday)
-        
-        logger.info("Holiday created", date=holiday.date, description=holiday.description, admin=admin_user.username)
-        return HolidayResponse.from_orm(holiday)
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Failed to create holiday", error=str(e), admin=admin_user.username)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create holiday"
@@ -286,9 +330,16 @@ async def create_holiday(
 
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_admin_user)
 ):
     """List all users"""
-    users = db.query(User).all()
-    return [UserResponse.from_orm(user) for user in users]
\ No newline at end of file
+    result = await db.execute(select(User.id, User.username, User.email, User.role, User.manager_id))
+    rows = result.all()
+    # Returning a Response directly bypasses FastAPI's response_model
+    # validation pass; the rows come straight from the DB
+    users = [
+        UserRow(row.id, row.username, row.email, row.role.value, row.manager_id)
+        for row in rows
+    ]
+    return Response(msgspec.json.encode(users), media_type="application/json")
\ No newline at end of file
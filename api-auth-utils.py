@@ -1,13 +1,17 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Union
 from jose import JWTError, jwt
+import time
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
 import os
 import structlog
 
-from database import get_db
+from database import get_db, get_redis
 from models import User, UserRole
 
 logger = structlog.get_logger()
@@ -17,9 +21,26 @@ SECRET_KEY = os.getenv("JWT_SECRET", "supersecret_change_in_production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
+# How long a resolved user may be served from Redis before re-querying
+# the DB; keep this short so role changes propagate quickly
+USER_CACHE_TTL_SECONDS = 60
+
 security = HTTPBearer()
 
 
+def _user_cache_key(username: str) -> str:
+    return f"auth:user:{username}"
+
+
+async def invalidate_user_cache(username: str):
+    """Drop the cached auth lookup for a user (e.g. after a role change)"""
+    try:
+        redis_client = await get_redis()
+        await redis_client.delete(_user_cache_key(username))
+    except Exception as e:
+        logger.warning("Failed to invalidate user cache", username=username, error=str(e))
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -33,21 +54,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+@lru_cache(maxsize=8192)
+def _decode_token(token: str) -> tuple:
+    """Decode and verify a JWT, cached by token string.
+
+    The same token repeats for up to 24h of requests, so caching the
+    HMAC check + JSON parse turns verification into a dict lookup.
+    Failed decodes raise and are never cached.
+    """
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return payload.get("sub"), payload.get("role"), payload.get("exp"), payload.get("uid")
+
+
 def verify_token(token: str) -> dict:
     """Verify and decode JWT token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        role: str = payload.get("role")
-        
+        username, role, exp, user_id = _decode_token(token)
+
         if username is None or role is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token payload",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        return {"username": username, "role": role}
+
+        # jose only checks exp at decode time, so cached hits must
+        # re-check it; an expired token never validates again
+        if exp is not None and time.time() >= exp:
+            logger.warning("JWT verification failed", error="token expired")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        return {"username": username, "role": role, "user_id": user_id}
     except JWTError as e:
         logger.warning("JWT verification failed", error=str(e))
         raise HTTPException(
@@ -59,21 +100,67 @@ def verify_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """Get current authenticated user"""
     token = credentials.credentials
     token_data = verify_token(token)
-    
-    user = db.query(User).filter(User.username == token_data["username"]).first()
+    username = token_data["username"]
+
+    # Cache-aside: resolving username -> User hits the DB on every
+    # authenticated request otherwise. Redis failures fall back to the DB.
+    redis_client = None
+    try:
+        redis_client = await get_redis()
+        cached = await redis_client.get(_user_cache_key(username))
+    except Exception as e:
+        logger.warning("User cache unavailable", error=str(e))
+        cached = None
+
+    if cached:
+        fields = json.loads(cached)
+        # Rebuild a detached User so handlers see the usual model; only
+        # plain columns are set, no identity-map or lazy-load machinery
+        return User(
+            id=fields["id"],
+            username=fields["username"],
+            email=fields["email"],
+            role=UserRole(fields["role"]),
+            manager_id=fields["manager_id"]
+        )
+
+    # Tokens issued since the uid claim was added resolve by primary key
+    # (identity-map aware and cheaper than the username index scan);
+    # older tokens fall back to the username lookup until they expire
+    if token_data["user_id"] is not None:
+        user = await db.get(User, token_data["user_id"])
+    else:
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalars().first()
     if user is None:
-        logger.warning("User not found", username=token_data["username"])
+        logger.warning("User not found", username=username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    if redis_client is not None:
+        try:
+            await redis_client.set(
+                _user_cache_key(username),
+                json.dumps({
+                    "id": user.id,
+                    "username": user.username,
+                    "email": user.email,
+                    "role": user.role.value,
+                    "manager_id": user.manager_id
+                }),
+                ex=USER_CACHE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Failed to cache user lookup", username=username, error=str(e))
+
     return user
 
 
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
 from typing import List
 from datetime import date, datetime
+import msgspec
 import structlog
 
-from database import get_db
-from models import User, LeaveRequest, LeaveBalance, CorporateHoliday, RequestStatus, UserRole
+from database import get_db, get_redis
+from models import User, LeaveRequest, LeaveBalance, LeaveType, CorporateHoliday, RequestStatus, UserRole
 from utils.auth import get_employee_user
 
 logger = structlog.get_logger()
@@ -53,27 +56,144 @@ class CreateRequestResponse(BaseModel):
     manager_notified: str
 
 
+def _send_submission_email_stub(employee_name: str, start_date: date, end_date: date, days_requested: int) -> None:
+    """Mock email notification to the manager; runs as a background task
+    after the response is sent so the stdout write never blocks the
+    event loop"""
+    print(f"EMAIL: New leave request from {employee_name} ({start_date} to {end_date}) - {days_requested} days")
+
+
+# msgspec rows for the list endpoints; encode much faster than Pydantic
+# for large responses while producing the same JSON shape
+class LeaveBalanceRow(msgspec.Struct):
+    leave_type_id: int
+    leave_type_name: str
+    remaining_days: int
+
+
+class LeaveRequestRow(msgspec.Struct):
+    id: int
+    leave_type_name: str
+    start_date: date
+    end_date: date
+    days_requested: int
+    status: str
+    notes: str | None
+    requested_at: datetime
+    decided_at: datetime | None
+    manager_name: str
+
+
+# Overlapping holidays, current balance and manager username for the
+# create-request pre-checks, fetched in a single roundtrip
+_CREATE_REQUEST_CHECKS = text("""
+    WITH h AS (
+        SELECT date FROM corporate_holidays
+        WHERE date BETWEEN :start_date AND :end_date
+    ),
+    b AS (
+        SELECT remaining_days FROM leave_balances
+        WHERE user_id = :user_id AND leave_type_id = :leave_type_id
+    ),
+    m AS (
+        SELECT username FROM users WHERE id = :manager_id
+    )
+    SELECT
+        (SELECT array_agg(date ORDER BY date) FROM h) AS holiday_dates,
+        (SELECT remaining_days FROM b) AS remaining_days,
+        (SELECT username FROM m) AS manager_username
+""")
+
+
+# Reduced variant used when the holiday overlap was already answered
+# from the Redis per-year holiday sets
+_BALANCE_MANAGER_CHECKS = text("""
+    WITH b AS (
+        SELECT remaining_days FROM leave_balances
+        WHERE user_id = :user_id AND leave_type_id = :leave_type_id
+    ),
+    m AS (
+        SELECT username FROM users WHERE id = :manager_id
+    )
+    SELECT
+        (SELECT remaining_days FROM b) AS remaining_days,
+        (SELECT username FROM m) AS manager_username
+""")
+
+
+# Sentinel member marking a year with no holidays at all, so an empty
+# year in the cache is distinguishable from a year never loaded
+_HOLIDAY_CACHE_EMPTY = "__empty__"
+
+
+async def _holiday_overlap_from_cache(db: AsyncSession, start_date: date, end_date: date) -> list | None:
+    """Check the requested range against the cached per-year holiday sets.
+
+    Each year's set is populated read-through from the DB the first time
+    it is needed, so it is always the complete year regardless of how its
+    holidays were created (seed, admin endpoint, or direct insert).
+    Returns the sorted ISO dates of overlapping holidays (possibly
+    empty), or None when Redis is unavailable and the caller must fall
+    back to the DB pre-check.
+    """
+    try:
+        redis_client = await get_redis()
+        cached_dates = set()
+        for year in range(start_date.year, end_date.year + 1):
+            cache_key = f"holidays:{year}"
+            members = await redis_client.smembers(cache_key)
+            if not members:
+                result = await db.execute(
+                    select(CorporateHoliday.date).where(
+                        CorporateHoliday.date.between(date(year, 1, 1), date(year, 12, 31))
+                    )
+                )
+                members = {d.isoformat() for d in result.scalars()} or {_HOLIDAY_CACHE_EMPTY}
+                await redis_client.sadd(cache_key, *members)
+                await redis_client.expire(cache_key, 86400 * 400)
+            cached_dates.update(members)
+    except Exception as e:
+        logger.warning("Holiday cache unavailable", error=str(e))
+        return None
+
+    cached_dates.discard(_HOLIDAY_CACHE_EMPTY)
+    return sorted(
+        iso_date for iso_date in cached_dates
+        if start_date <= date.fromisoformat(iso_date) <= end_date
+    )
+
+
 @router.get("/balance", response_model=List[LeaveBalanceResponse])
 async def get_leave_balance(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     employee_user: User = Depends(get_employee_user)
 ):
     """Get employee's remaining leave balance for all leave types"""
     try:
-        balances = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == employee_user.id
-        ).all()
-        
+        # Only three columns are serialized, so join and select them
+        # directly instead of hydrating ORM objects for both tables
+        result = await db.execute(
+            select(
+                LeaveBalance.leave_type_id,
+                LeaveType.name,
+                LeaveBalance.remaining_days
+            ).join(
+                LeaveType, LeaveBalance.leave_type_id == LeaveType.id
+            ).where(LeaveBalance.user_id == employee_user.id)
+        )
+
         response_list = []
-        for balance in balances:
-            response_list.append(LeaveBalanceResponse(
-                leave_type_id=balance.leave_type_id,
-                leave_type_name=balance.leave_type.name,
-                remaining_days=balance.remaining_days
+        for leave_type_id, leave_type_name, remaining_days in result.all():
+            response_list.append(LeaveBalanceRow(
+                leave_type_id=leave_type_id,
+                leave_type_name=leave_type_name,
+                remaining_days=remaining_days
             ))
-        
-        logger.info("Leave balance retrieved", employee=employee_user.username, balances_count=len(response_list))
-        return response_list
+
+        logger.debug("Leave balance retrieved", employee=employee_user.username, balances_count=len(response_list))
+        # Returning a Response directly also bypasses FastAPI's
+        # response_model validation pass
+        return Response(msgspec.json.encode(response_list), media_type="application/json")
         
     except Exception as e:
         logger.error("Failed to get leave balance", employee=employee_user.username, error=str(e))
@@ -86,7 +206,8 @@ async def get_leave_balance(
 @router.post("/requests", response_model=CreateRequestResponse)
 async def create_leave_request(
     request_data: LeaveRequestCreate,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     employee_user: User = Depends(get_employee_user)
 ):
     """Create a new leave request"""
@@ -120,35 +241,51 @@ async def create_leave_request(
                 detail="No business days in the requested date range"
             )
         
-        # Check if dates overlap with corporate holidays
-        overlapping_holidays = db.query(CorporateHoliday).filter(
-            CorporateHoliday.date >= request_data.start_date,
-            CorporateHoliday.date <= request_data.end_date
-        ).all()
-        
-        if overlapping_holidays:
-            holiday_dates = [h.date.strftime("%Y-%m-%d") for h in overlapping_holidays]
+        # Answer the holiday overlap from Redis when the touched years are
+        # cached; otherwise fold it into the DB pre-check query. Either
+        # way the DB sees at most one read roundtrip here.
+        formatted_dates = await _holiday_overlap_from_cache(
+            db, request_data.start_date, request_data.end_date
+        )
+
+        if formatted_dates is None:
+            holiday_dates, remaining_days, manager_username = (await db.execute(
+                _CREATE_REQUEST_CHECKS,
+                {
+                    "start_date": request_data.start_date,
+                    "end_date": request_data.end_date,
+                    "user_id": employee_user.id,
+                    "leave_type_id": request_data.leave_type_id,
+                    "manager_id": employee_user.manager_id
+                }
+            )).one()
+            formatted_dates = [d.strftime("%Y-%m-%d") for d in holiday_dates] if holiday_dates else []
+        else:
+            remaining_days, manager_username = (await db.execute(
+                _BALANCE_MANAGER_CHECKS,
+                {
+                    "user_id": employee_user.id,
+                    "leave_type_id": request_data.leave_type_id,
+                    "manager_id": employee_user.manager_id
+                }
+            )).one()
+
+        if formatted_dates:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Leave request overlaps with corporate holidays: {', '.join(holiday_dates)}"
+                detail=f"Leave request overlaps with corporate holidays: {', '.join(formatted_dates)}"
             )
-        
-        # Check employee's leave balance
-        balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == employee_user.id,
-            LeaveBalance.leave_type_id == request_data.leave_type_id
-        ).first()
-        
-        if not balance:
+
+        if remaining_days is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Leave balance not found for this leave type"
             )
-        
-        if balance.remaining_days < days_requested:
+
+        if remaining_days < days_requested:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient leave balance. Available: {balance.remaining_days} days, Requested: {days_requested} days"
+                detail=f"Insufficient leave balance. Available: {remaining_days} days, Requested: {days_requested} days"
             )
         
         # Create leave request
@@ -158,39 +295,41 @@ async def create_leave_request(
             leave_type_id=request_data.leave_type_id,
             start_date=request_data.start_date,
             end_date=request_data.end_date,
+            days_requested=days_requested,
             status=RequestStatus.PENDING,
             notes=request_data.notes
         )
         
         db.add(leave_request)
-        db.commit()
-        db.refresh(leave_request)
-        
-        # Mock email notification to manager
-        manager = db.query(User).filter(User.id == employee_user.manager_id).first()
-        mock_email_message = f"EMAIL: New leave request from {employee_user.username} ({request_data.start_date} to {request_data.end_date}) - {days_requested} days"
-        print(mock_email_message)
-        
+        await db.commit()
+        await db.refresh(leave_request)
+
+        # Mock email notification to manager, sent after the response
+        background_tasks.add_task(
+            _send_submission_email_stub, employee_user.username,
+            request_data.start_date, request_data.end_date, days_requested
+        )
+
         logger.info(
             "Leave request created",
             request_id=leave_request.id,
             employee=employee_user.username,
-            manager=manager.username if manager else "Unknown",
+            manager=manager_username if manager_username else "Unknown",
             days_requested=days_requested,
             leave_type_id=request_data.leave_type_id
         )
-        
+
         return CreateRequestResponse(
             message="Leave request submitted successfully",
             request_id=leave_request.id,
-            manager_notified=manager.username if manager else "Unknown"
+            manager_notified=manager_username if manager_username else "Unknown"
         )
         
     except HTTPException:
         raise
     except Exception as e:
         logger.error("Failed to create leave request", employee=employee_user.username, error=str(e))
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create leave request"
@@ -199,34 +338,40 @@ async def create_leave_request(
 
 @router.get("/requests", response_model=List[LeaveRequestResponse])
 async def get_leave_requests_history(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     employee_user: User = Depends(get_employee_user)
 ):
     """Get employee's leave request history"""
     try:
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.employee_id == employee_user.id
-        ).order_by(LeaveRequest.requested_at.desc()).all()
+        # Eager-load the relationships touched during serialization so the
+        # whole history is fetched in one query instead of 2N+1
+        result = await db.execute(
+            select(LeaveRequest).options(
+                joinedload(LeaveRequest.leave_type),
+                joinedload(LeaveRequest.manager)
+            ).where(
+                LeaveRequest.employee_id == employee_user.id
+            ).order_by(LeaveRequest.requested_at.desc())
+        )
+        requests = result.scalars().all()
         
         response_list = []
         for req in requests:
-            days_requested = _calculate_business_days(req.start_date, req.end_date)
-            
-            response_list.append(LeaveRequestResponse(
+            response_list.append(LeaveRequestRow(
                 id=req.id,
                 leave_type_name=req.leave_type.name,
                 start_date=req.start_date,
                 end_date=req.end_date,
-                days_requested=days_requested,
+                days_requested=req.days_requested,
                 status=req.status.value,
                 notes=req.notes,
                 requested_at=req.requested_at,
                 decided_at=req.decided_at,
                 manager_name=req.manager.username if req.manager else "No Manager"
             ))
-        
-        logger.info("Leave request history retrieved", employee=employee_user.username, requests_count=len(response_list))
-        return response_list
+
+        logger.debug("Leave request history retrieved", employee=employee_user.username, requests_count=len(response_list))
+        return Response(msgspec.json.encode(response_list), media_type="application/json")
         
     except Exception as e:
         logger.error("Failed to get leave request history", employee=employee_user.username, error=str(e))
@@ -236,15 +381,21 @@ async def get_leave_requests_history(
         )
 
 
+# Business days in a partial week, indexed by [start weekday][length in
+# days]; precomputed once at import so the calculation below is O(1)
+_REMAINDER_BUSINESS_DAYS = [
+    [sum(1 for i in range(length) if (weekday + i) % 7 < 5) for length in range(7)]
+    for weekday in range(7)
+]
+
+
 def _calculate_business_days(start_date: date, end_date: date) -> int:
     """Calculate business days between two dates (excluding weekends)"""
-    days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Monday = 0, Sunday = 6, so weekdays are 0-4
-        if current_date.weekday() < 5:
-            days += 1
-        current_date = date.fromordinal(current_date.toordinal() + 1)
-    
-    return days
\ No newline at end of file
+    total_days = (end_date - start_date).days + 1
+    if total_days <= 0:
+        return 0
+
+    # Every full week contributes 5 business days; the remainder comes
+    # from the lookup table (Monday = 0, so weekdays are 0-4)
+    full_weeks, remainder = divmod(total_days, 7)
+    return full_weeks * 5 + _REMAINDER_BUSINESS_DAYS[start_date.weekday()][remainder]
\ No newline at end of file
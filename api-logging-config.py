@@ -1,22 +1,72 @@
 import structlog
 import logging
+import logging.handlers
 import os
+import queue
+import sys
 from typing import Any
 
+# Bounded queue between application threads and the listener thread;
+# logging never blocks the event loop on a write() syscall
+_log_queue: queue.Queue = queue.Queue(maxsize=10000)
+_queue_listener = None
+
+
+class _PassthroughQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records untouched.
+
+    The stock prepare() formats the record and replaces record.msg with
+    the rendered string (so records survive pickling), but the listener's
+    ProcessorFormatter needs the original structlog event dict in
+    record.msg. This queue is in-process, so nothing needs pickling and
+    the record can cross as-is.
+    """
+
+    def prepare(self, record):
+        return record
+
 
 def setup_logging():
     """Configure structured logging for the application"""
-    
+    global _queue_listener
+
     # Get log level from environment
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
-    
-    # Configure standard library logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=None,
-        level=getattr(logging, log_level, logging.INFO),
+
+    # Rendering (JSON dumps / console colorizing) is the expensive part of
+    # a log call, so it runs in the listener thread too: structlog hands
+    # the raw event dict across the queue and this ProcessorFormatter
+    # renders it on the other side
+    renderer = (
+        structlog.processors.JSONRenderer() if os.getenv("ENVIRONMENT") == "production"
+        else structlog.dev.ConsoleRenderer(colors=True)
     )
-    
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processor=renderer,
+        # Records from plain stdlib loggers (uvicorn etc.) get the same
+        # treatment so all output shares one format
+        foreign_pre_chain=[
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    )
+
+    # The handler doing real I/O runs on a background QueueListener
+    # thread; the root logger only gets a cheap QueueHandler
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, log_level, logging.INFO))
+    root_logger.handlers.clear()
+    root_logger.addHandler(_PassthroughQueueHandler(_log_queue))
+
+    _queue_listener = logging.handlers.QueueListener(
+        _log_queue, stream_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+
     # Configure structlog
     structlog.configure(
         processors=[
@@ -28,8 +78,9 @@ def setup_logging():
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer() if os.getenv("ENVIRONMENT") == "production" 
-            else structlog.dev.ConsoleRenderer(colors=True)
+            # Defer rendering to the ProcessorFormatter on the listener
+            # thread instead of doing it inline on the caller
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
@@ -38,6 +89,14 @@ def setup_logging():
     )
 
 
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
 def get_logger(name: str = None) -> Any:
     """Get a structured logger instance"""
-    return structlog.get_logger(name)
\ No newline at end of file
+    return structlog.get_logger(name)
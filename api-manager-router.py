@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from pydantic import BaseModel
 from typing import List
 from datetime import datetime, date
@@ -39,24 +42,40 @@ class DecisionResponse(BaseModel):
     new_status: str
 
 
+def _send_decision_email_stub(decision: str, employee_name: str, start_date: date, end_date: date) -> None:
+    """Mock email notification; runs as a background task after the
+    response is sent so the stdout write never blocks the event loop"""
+    print(f"EMAIL: Leave request {decision} for {employee_name} ({start_date} to {end_date})")
+
+
 @router.get("/requests/pending", response_model=List[LeaveRequestResponse])
 async def get_pending_requests(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     manager_user: User = Depends(get_manager_user)
 ):
     """Get all pending leave requests for this manager"""
     try:
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.manager_id == manager_user.id,
-            LeaveRequest.status == RequestStatus.PENDING
-        ).all()
+        # Relationships must be loaded up front; lazy loading is not
+        # available on an AsyncSession. selectinload for employee avoids
+        # the self-join on users, joinedload is fine for the small
+        # leave_types table.
+        result = await db.execute(
+            select(LeaveRequest).options(
+                selectinload(LeaveRequest.employee),
+                joinedload(LeaveRequest.leave_type)
+            ).where(
+                LeaveRequest.manager_id == manager_user.id,
+                LeaveRequest.status == RequestStatus.PENDING
+            )
+        )
+        requests = result.scalars().all()
         
-        response_list = []
-        for req in requests:
-            # Calculate days requested (business days only, excluding weekends)
-            days_requested = _calculate_business_days(req.start_date, req.end_date)
-            
-            response_list.append(LeaveRequestResponse(
+        # Rows come straight from the DB: model_construct skips per-field
+        # validation and the explicit ORJSONResponse skips the
+        # response_model re-validation pass (the decorator's model still
+        # documents the schema)
+        response_list = [
+            LeaveRequestResponse.model_construct(
                 id=req.id,
                 employee_id=req.employee_id,
                 employee_name=req.employee.username,
@@ -64,15 +83,17 @@ async def get_pending_requests(
                 leave_type_name=req.leave_type.name,
                 start_date=req.start_date,
                 end_date=req.end_date,
-                days_requested=days_requested,
+                days_requested=req.days_requested,
                 status=req.status.value,
                 notes=req.notes,
                 requested_at=req.requested_at,
                 decided_at=req.decided_at
-            ))
-        
-        logger.info("Pending requests retrieved", manager=manager_user.username, count=len(response_list))
-        return response_list
+            ).model_dump()
+            for req in requests
+        ]
+
+        logger.debug("Pending requests retrieved", manager=manager_user.username, count=len(response_list))
+        return ORJSONResponse(response_list)
         
     except Exception as e:
         logger.error("Failed to get pending requests", manager=manager_user.username, error=str(e))
@@ -85,60 +106,80 @@ async def get_pending_requests(
 @router.post("/requests/{request_id}/approve", response_model=DecisionResponse)
 async def approve_request(
     request_id: int,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     manager_user: User = Depends(get_manager_user)
 ):
     """Approve a leave request and update employee balance"""
     try:
-        # Get the request
-        request = db.query(LeaveRequest).filter(
-            LeaveRequest.id == request_id,
-            LeaveRequest.manager_id == manager_user.id,
-            LeaveRequest.status == RequestStatus.PENDING
-        ).first()
-        
-        if not request:
+        # Flip the status with one guarded UPDATE instead of loading the
+        # ORM object first; the WHERE clause doubles as the existence,
+        # ownership and still-pending checks, and RETURNING hands back the
+        # columns needed for the balance update and the notification
+        result = await db.execute(
+            update(LeaveRequest).where(
+                LeaveRequest.id == request_id,
+                LeaveRequest.manager_id == manager_user.id,
+                LeaveRequest.status == RequestStatus.PENDING
+            ).values(
+                status=RequestStatus.APPROVED,
+                decided_at=func.now()
+            ).returning(
+                LeaveRequest.employee_id,
+                LeaveRequest.leave_type_id,
+                LeaveRequest.start_date,
+                LeaveRequest.end_date,
+                LeaveRequest.days_requested
+            )
+        )
+        row = result.first()
+
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Leave request not found or not pending"
             )
-        
-        # Calculate days to deduct
-        days_requested = _calculate_business_days(request.start_date, request.end_date)
-        
-        # Get employee's leave balance
-        balance = db.query(LeaveBalance).filter(
-            LeaveBalance.user_id == request.employee_id,
-            LeaveBalance.leave_type_id == request.leave_type_id
-        ).first()
-        
-        if not balance:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Employee leave balance not found"
-            )
-        
-        # Check if employee has enough balance
-        if balance.remaining_days < days_requested:
+
+        employee_id, leave_type_id, start_date, end_date, days_requested = row
+
+        # Deduct with a single conditional UPDATE: it only fires while
+        # enough balance remains, so concurrent approvals cannot overspend
+        # the way a read-check-write sequence could. A failure rolls the
+        # status change above back too.
+        result = await db.execute(
+            update(LeaveBalance).where(
+                LeaveBalance.user_id == employee_id,
+                LeaveBalance.leave_type_id == leave_type_id,
+                LeaveBalance.remaining_days >= days_requested
+            ).values(
+                remaining_days=LeaveBalance.remaining_days - days_requested
+            ).returning(LeaveBalance.remaining_days)
+        )
+
+        if result.first() is None:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient leave balance"
             )
-        
-        # Update request status and balance atomically
-        request.status = RequestStatus.APPROVED
-        request.decided_at = datetime.utcnow()
-        balance.remaining_days -= days_requested
-        
-        db.commit()
-        
-        # Mock email notification
-        print(f"EMAIL: Leave request approved for {request.employee.username} ({request.start_date} to {request.end_date})")
-        
+
+        # Only the name is needed downstream; no ORM User hydration
+        employee_name = (await db.execute(
+            select(User.username).where(User.id == employee_id)
+        )).scalar_one()
+
+        await db.commit()
+
+        # Mock email notification, sent after the response
+        background_tasks.add_task(
+            _send_decision_email_stub, "approved",
+            employee_name, start_date, end_date
+        )
+
         logger.info(
             "Leave request approved",
             request_id=request_id,
-            employee=request.employee.username,
+            employee=employee_name,
             manager=manager_user.username,
             days_deducted=days_requested
         )
@@ -153,7 +194,7 @@ async def approve_request(
         raise
     except Exception as e:
         logger.error("Failed to approve request", request_id=request_id, manager=manager_user.username, error=str(e))
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to approve leave request"
@@ -163,37 +204,55 @@ async def approve_request(
 @router.post("/requests/{request_id}/reject", response_model=DecisionResponse)
 async def reject_request(
     request_id: int,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
     manager_user: User = Depends(get_manager_user)
 ):
     """Reject a leave request"""
     try:
-        # Get the request
-        request = db.query(LeaveRequest).filter(
-            LeaveRequest.id == request_id,
-            LeaveRequest.manager_id == manager_user.id,
-            LeaveRequest.status == RequestStatus.PENDING
-        ).first()
-        
-        if not request:
+        # Same guarded UPDATE ... RETURNING shape as approval: one
+        # statement covers the existence/ownership/pending checks and the
+        # status flip, and returns what the notification needs
+        result = await db.execute(
+            update(LeaveRequest).where(
+                LeaveRequest.id == request_id,
+                LeaveRequest.manager_id == manager_user.id,
+                LeaveRequest.status == RequestStatus.PENDING
+            ).values(
+                status=RequestStatus.REJECTED,
+                decided_at=func.now()
+            ).returning(
+                LeaveRequest.employee_id,
+                LeaveRequest.start_date,
+                LeaveRequest.end_date
+            )
+        )
+        row = result.first()
+
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Leave request not found or not pending"
             )
-        
-        # Update request status
-        request.status = RequestStatus.REJECTED
-        request.decided_at = datetime.utcnow()
-        
-        db.commit()
-        
-        # Mock email notification
-        print(f"EMAIL: Leave request rejected for {request.employee.username} ({request.start_date} to {request.end_date})")
-        
+
+        employee_id, start_date, end_date = row
+
+        employee_name = (await db.execute(
+            select(User.username).where(User.id == employee_id)
+        )).scalar_one()
+
+        await db.commit()
+
+        # Mock email notification, sent after the response
+        background_tasks.add_task(
+            _send_decision_email_stub, "rejected",
+            employee_name, start_date, end_date
+        )
+
         logger.info(
             "Leave request rejected",
             request_id=request_id,
-            employee=request.employee.username,
+            employee=employee_name,
             manager=manager_user.username
         )
         
@@ -207,7 +266,7 @@ async def reject_request(
         raise
     except Exception as e:
         logger.error("Failed to reject request", request_id=request_id, manager=manager_user.username, error=str(e))
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to reject leave request"
@@ -216,20 +275,25 @@ async def reject_request(
 
 @router.get("/requests/history", response_model=List[LeaveRequestResponse])
 async def get_request_history(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     manager_user: User = Depends(get_manager_user)
 ):
     """Get all leave requests (history) for this manager"""
     try:
-        requests = db.query(LeaveRequest).filter(
-            LeaveRequest.manager_id == manager_user.id
-        ).order_by(LeaveRequest.requested_at.desc()).all()
+        result = await db.execute(
+            select(LeaveRequest).options(
+                selectinload(LeaveRequest.employee),
+                joinedload(LeaveRequest.leave_type)
+            ).where(
+                LeaveRequest.manager_id == manager_user.id
+            ).order_by(LeaveRequest.requested_at.desc())
+        )
+        requests = result.scalars().all()
         
-        response_list = []
-        for req in requests:
-            days_requested = _calculate_business_days(req.start_date, req.end_date)
-            
-            response_list.append(LeaveRequestResponse(
+        # Same trusted-data shortcut as the pending list: construct
+        # without validation and serialize once with orjson
+        response_list = [
+            LeaveRequestResponse.model_construct(
                 id=req.id,
                 employee_id=req.employee_id,
                 employee_name=req.employee.username,
@@ -237,15 +301,17 @@ async def get_request_history(
                 leave_type_name=req.leave_type.name,
                 start_date=req.start_date,
                 end_date=req.end_date,
-                days_requested=days_requested,
+                days_requested=req.days_requested,
                 status=req.status.value,
                 notes=req.notes,
                 requested_at=req.requested_at,
                 decided_at=req.decided_at
-            ))
-        
-        logger.info("Request history retrieved", manager=manager_user.username, count=len(response_list))
-        return response_list
+            ).model_dump()
+            for req in requests
+        ]
+
+        logger.debug("Request history retrieved", manager=manager_user.username, count=len(response_list))
+        return ORJSONResponse(response_list)
         
     except Exception as e:
         logger.error("Failed to get request history", manager=manager_user.username, error=str(e))
@@ -255,15 +321,3 @@ async def get_request_history(
         )
 
 
-def _calculate_business_days(start_date: date, end_date: date) -> int:
-    """Calculate business days between two dates (excluding weekends)"""
-    days = 0
-    current_date = start_date
-    
-    while current_date <= end_date:
-        # Monday = 0, Sunday = 6, so weekdays are 0-4
-        if current_date.weekday() < 5:
-            days += 1
-        current_date = date.fromordinal(current_date.toordinal() + 1)
-    
-    return days
\ No newline at end of file
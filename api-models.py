@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Index, Integer, String, Text, Date, DateTime, ForeignKey, Enum
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -68,7 +68,12 @@ class LeaveType(Base):
 
 class LeaveBalance(Base):
     __tablename__ = "leave_balances"
-    
+    __table_args__ = (
+        # One balance row per user/leave-type pair; also the conflict
+        # target for the admin upsert
+        Index("ix_lb_user_type", "user_id", "leave_type_id", unique=True),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     leave_type_id = Column(Integer, ForeignKey("leave_types.id"), nullable=False)
@@ -84,13 +89,25 @@ class LeaveBalance(Base):
 
 class LeaveRequest(Base):
     __tablename__ = "leave_requests"
-    
+    __table_args__ = (
+        # Matches the history endpoint's filter + ORDER BY requested_at;
+        # btree scans backwards, so DESC ordering is covered too
+        Index("ix_lr_emp_requested", "employee_id", "requested_at"),
+        # Manager-side queries: pending list filters (manager_id, status),
+        # history filters manager_id and orders by requested_at
+        Index("ix_lr_manager_status", "manager_id", "status"),
+        Index("ix_lr_manager_requested_at", "manager_id", "requested_at"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     leave_type_id = Column(Integer, ForeignKey("leave_types.id"), nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
+    # Business days in the range, computed once at creation so read paths
+    # never recalculate it
+    days_requested = Column(Integer, nullable=False)
     status = Column(Enum(RequestStatus), nullable=False, default=RequestStatus.PENDING)
     notes = Column(Text, nullable=True)
     requested_at = Column(DateTime(timezone=True), server_default=func.now())
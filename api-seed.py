@@ -1,5 +1,5 @@
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from sqlalchemy import func, select
+from database import AsyncSessionLocal
 from models import User, LeaveType, LeaveBalance, CorporateHoliday, UserRole
 from datetime import date
 import structlog
@@ -33,75 +33,69 @@ demo_holidays = [
 
 async def seed_demo_data():
     """Seed the database with demo data"""
-    db = SessionLocal()
-    
+    db = AsyncSessionLocal()
+
     try:
         # Check if data already exists
-        existing_users = db.query(User).count()
+        existing_users = (await db.execute(select(func.count()).select_from(User))).scalar()
         if existing_users > 0:
             logger.info("Demo data already exists, skipping seed")
             return
         
         logger.info("Starting demo data seeding")
-        
-        # Create leave types first
-        leave_types = {}
-        for lt_data in demo_leave_types:
-            leave_type = LeaveType(**lt_data)
-            db.add(leave_type)
-            db.flush()  # Get the ID
-            leave_types[lt_data["name"]] = leave_type
-            logger.info(f"Created leave type: {lt_data['name']}")
-        
-        # Create users
+
+        # Create leave types first; one add_all + flush sends them as a
+        # single batched INSERT instead of a roundtrip per row
+        leave_types = {lt_data["name"]: LeaveType(**lt_data) for lt_data in demo_leave_types}
+        db.add_all(leave_types.values())
+        await db.flush()  # Get the IDs
+        logger.info("Created leave types", count=len(leave_types))
+
+        # Create users (manager links are wired up after the flush
+        # assigns IDs)
         users = {}
         for user_data in demo_users:
             user_dict = user_data.copy()
-            manager_username = user_dict.pop("manager_username", None)
-            
-            user = User(**user_dict)
-            db.add(user)
-            db.flush()  # Get the ID
-            users[user_dict["username"]] = user
-            logger.info(f"Created user: {user_dict['username']} ({user_dict['role']})")
-        
+            user_dict.pop("manager_username", None)
+            users[user_dict["username"]] = User(**user_dict)
+
+        db.add_all(users.values())
+        await db.flush()  # Get the IDs
+        logger.info("Created users", count=len(users))
+
         # Set manager relationships
         for user_data in demo_users:
             manager_username = user_data.get("manager_username")
             if manager_username:
-                user = users[user_data["username"]]
-                manager = users[manager_username]
-                user.manager_id = manager.id
-                logger.info(f"Set {user.username}'s manager to {manager.username}")
-        
-        # Create leave balances for employees
-        for username, user in users.items():
-            if user.role == UserRole.EMPLOYEE:
-                for leave_type in leave_types.values():
-                    balance = LeaveBalance(
-                        user_id=user.id,
-                        leave_type_id=leave_type.id,
-                        remaining_days=leave_type.default_quota
-                    )
-                    db.add(balance)
-                    logger.info(f"Created balance: {user.username} - {leave_type.name}: {leave_type.default_quota} days")
-        
-        # Create corporate holidays
-        for holiday_data in demo_holidays:
-            holiday = CorporateHoliday(
+                users[user_data["username"]].manager_id = users[manager_username].id
+
+        # Create leave balances for employees and corporate holidays;
+        # both tables go out with the commit's single flush
+        db.add_all([
+            LeaveBalance(
+                user_id=user.id,
+                leave_type_id=leave_type.id,
+                remaining_days=leave_type.default_quota
+            )
+            for user in users.values() if user.role == UserRole.EMPLOYEE
+            for leave_type in leave_types.values()
+        ])
+
+        db.add_all([
+            CorporateHoliday(
                 date=date.fromisoformat(holiday_data["date"]),
                 description=holiday_data["description"]
             )
-            db.add(holiday)
-            logger.info(f"Created holiday: {holiday_data['date']} - {holiday_data['description']}")
-        
+            for holiday_data in demo_holidays
+        ])
+
         # Commit all changes
-        db.commit()
+        await db.commit()
         logger.info("Demo data seeding completed successfully")
-        
+
     except Exception as e:
         logger.error("Failed to seed demo data", error=str(e))
-        db.rollback()
+        await db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        await db.close()
\ No newline at end of file
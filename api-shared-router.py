@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List
 from datetime import date
+import orjson
 import structlog
 
-from database import get_db
+from database import get_db, get_redis
 from models import LeaveType, CorporateHoliday, User
 from utils.auth import get_current_user
 
@@ -13,13 +15,19 @@ logger = structlog.get_logger()
 
 router = APIRouter()
 
+# Reference data changes only through the admin endpoints, which drop
+# these keys on write; the TTL is just a backstop
+LEAVE_TYPES_CACHE_KEY = "cache:leave_types"
+HOLIDAYS_CACHE_KEY = "cache:holidays"
+REFERENCE_CACHE_TTL_SECONDS = 300
+
 
 # Pydantic models
 class LeaveTypeResponse(BaseModel):
     id: int
     name: str
     default_quota: int
-    
+
     class Config:
         from_attributes = True
 
@@ -28,23 +36,56 @@ class HolidayResponse(BaseModel):
     id: int
     date: date
     description: str
-    
+
     class Config:
         from_attributes = True
 
 
+async def _cached_json(cache_key: str) -> bytes | None:
+    """Return the cached serialized payload, or None on miss/error"""
+    try:
+        redis_client = await get_redis()
+        cached = await redis_client.get(cache_key)
+        if cached is not None:
+            return cached
+    except Exception as e:
+        logger.warning("Reference cache unavailable", key=cache_key, error=str(e))
+    return None
+
+
+async def _store_json(cache_key: str, payload: bytes) -> None:
+    try:
+        redis_client = await get_redis()
+        await redis_client.setex(cache_key, REFERENCE_CACHE_TTL_SECONDS, payload)
+    except Exception as e:
+        logger.warning("Failed to populate reference cache", key=cache_key, error=str(e))
+
+
 @router.get("/leave-types", response_model=List[LeaveTypeResponse])
 async def get_leave_types(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all available leave types"""
     try:
-        leave_types = db.query(LeaveType).all()
-        
-        logger.info("Leave types retrieved", user=current_user.username, count=len(leave_types))
-        return [LeaveTypeResponse.from_orm(lt) for lt in leave_types]
-        
+        # Cache-aside on the serialized payload: a hit skips the DB query
+        # and the serialization entirely
+        cached = await _cached_json(LEAVE_TYPES_CACHE_KEY)
+        if cached is not None:
+            return Response(cached, media_type="application/json")
+
+        result = await db.execute(select(LeaveType))
+        leave_types = result.scalars().all()
+
+        payload = orjson.dumps([
+            {"id": lt.id, "name": lt.name, "default_quota": lt.default_quota}
+            for lt in leave_types
+        ])
+        await _store_json(LEAVE_TYPES_CACHE_KEY, payload)
+
+        logger.debug("Leave types retrieved", user=current_user.username, count=len(leave_types))
+        return Response(payload, media_type="application/json")
+
     except Exception as e:
         logger.error("Failed to get leave types", user=current_user.username, error=str(e))
         raise HTTPException(
@@ -55,19 +96,30 @@ async def get_leave_types(
 
 @router.get("/holidays", response_model=List[HolidayResponse])
 async def get_holidays(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get all corporate holidays"""
     try:
-        holidays = db.query(CorporateHoliday).order_by(CorporateHoliday.date).all()
-        
-        logger.info("Holidays retrieved", user=current_user.username, count=len(holidays))
-        return [HolidayResponse.from_orm(holiday) for holiday in holidays]
-        
+        cached = await _cached_json(HOLIDAYS_CACHE_KEY)
+        if cached is not None:
+            return Response(cached, media_type="application/json")
+
+        result = await db.execute(select(CorporateHoliday).order_by(CorporateHoliday.date))
+        holidays = result.scalars().all()
+
+        payload = orjson.dumps([
+            {"id": holiday.id, "date": holiday.date, "description": holiday.description}
+            for holiday in holidays
+        ])
+        await _store_json(HOLIDAYS_CACHE_KEY, payload)
+
+        logger.debug("Holidays retrieved", user=current_user.username, count=len(holidays))
+        return Response(payload, media_type="application/json")
+
     except Exception as e:
         logger.error("Failed to get holidays", user=current_user.username, error=str(e))
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve holidays"
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,41 @@
+from datetime import date, timedelta
+
+import pytest
+
+from routers.employee import _calculate_business_days
+
+
+def _loop_business_days(start_date: date, end_date: date) -> int:
+    """Reference implementation: the day-by-day loop the closed form replaced"""
+    business_days = 0
+    current_date = start_date
+    while current_date <= end_date:
+        if current_date.weekday() < 5:
+            business_days += 1
+        current_date += timedelta(days=1)
+    return business_days
+
+
+# 2024-01-01 is a Monday, so offsets 0-6 cover every start weekday
+_MONDAY = date(2024, 1, 1)
+
+
+@pytest.mark.parametrize("start_offset", range(7))
+@pytest.mark.parametrize("length_days", range(91))
+def test_matches_loop_for_every_weekday_and_length(start_offset, length_days):
+    start_date = _MONDAY + timedelta(days=start_offset)
+    end_date = start_date + timedelta(days=length_days)
+    assert _calculate_business_days(start_date, end_date) == _loop_business_days(start_date, end_date)
+
+
+def test_single_weekday_counts_one():
+    assert _calculate_business_days(_MONDAY, _MONDAY) == 1
+
+
+def test_weekend_only_range_counts_zero():
+    saturday = _MONDAY + timedelta(days=5)
+    assert _calculate_business_days(saturday, saturday + timedelta(days=1)) == 0
+
+
+def test_reversed_range_counts_zero():
+    assert _calculate_business_days(_MONDAY, _MONDAY - timedelta(days=1)) == 0
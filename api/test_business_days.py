@@ -0,0 +1 @@
+# ...existing code from api-test-business-days.py...
@@ -107,6 +107,7 @@ if exist "api-models.py" copy "api-models.py" "api\models.py" >nul
 if exist "api-database.py" copy "api-database.py" "api\database.py" >nul
 if exist "api-seed.py" copy "api-seed.py" "api\seed.py" >nul
 if exist "api-requirements.txt" copy "api-requirements.txt" "api\requirements.txt" >nul
+if exist "api-test-business-days.py" copy "api-test-business-days.py" "api\test_business_days.py" >nul
 
 if exist "api-routers-init.py" copy "api-routers-init.py" "api\routers\__init__.py" >nul
 if exist "api-admin-router.py" copy "api-admin-router.py" "api\routers\admin.py" >nul
@@ -133,6 +133,7 @@ $apiFiles = @{
     "api-database.py" = "api\database.py"
     "api-seed.py" = "api\seed.py"
     "api-requirements.txt" = "api\requirements.txt"
+    "api-test-business-days.py" = "api\test_business_days.py"
     "api-routers-init.py" = "api\routers\__init__.py"
     "api-admin-router.py" = "api\routers\admin.py"
     "api-manager-router.py" = "api\routers\manager.py"